@@ -0,0 +1,109 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Cada cenário é executado em um interpretador novo para medir o cold start real
+CENARIOS_COLD_START = {
+    "import_main": [sys.executable, "-c", "import main"],
+    "import_rag": [sys.executable, "-c", "import rag"],
+    "stats": [sys.executable, "main.py", "stats"],
+    "import_langchain": [sys.executable, "-c",
+                         "import langchain_community.vectorstores, langchain_openai, langchain.chains"],
+}
+
+def medir_comando(comando: List[str], repeticoes: int) -> Dict[str, float]:
+    """Executa o comando várias vezes e retorna estatísticas do tempo em segundos"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run(comando, cwd=SRC_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        tempos.append(time.perf_counter() - inicio)
+    return {
+        "min": min(tempos),
+        "mediana": statistics.median(tempos),
+        "max": max(tempos),
+    }
+
+def benchmark_cold_start(repeticoes: int = 5) -> Dict[str, Dict[str, float]]:
+    """Mede o tempo de inicialização de cada cenário de cold start"""
+    return {nome: medir_comando(comando, repeticoes) for nome, comando in CENARIOS_COLD_START.items()}
+
+def gerar_vetores_sinteticos(num_vetores: int, dimensao: int, num_consultas: int, semente: int = 0):
+    """Gera vetores normalizados agrupados em clusters, parecidos com embeddings ada-002"""
+    import numpy as np
+
+    rng = np.random.default_rng(semente)
+    centros = rng.standard_normal((max(num_vetores // 50, 1), dimensao)).astype(np.float32)
+
+    def amostrar(n):
+        vetores = centros[rng.integers(0, len(centros), n)] + 0.5 * rng.standard_normal((n, dimensao)).astype(np.float32)
+        return vetores / np.linalg.norm(vetores, axis=1, keepdims=True)
+
+    return amostrar(num_vetores), amostrar(num_consultas)
+
+def benchmark_recall(num_vetores: int = 5000, dimensao: int = 1536, num_consultas: int = 200,
+                     k: int = 5) -> Dict[str, Dict[str, float]]:
+    """Mede recall@k e memória de cada modo compacto contra a busca exata em float32
+
+    A memória compara os índices serializados (IndexFlatL2 vs. índice
+    quantizado), incluindo o codebook do PQ.
+    """
+    import faiss
+    from indice_compacto import IndiceCompacto, MODOS_COMPACTOS
+
+    vetores, consultas = gerar_vetores_sinteticos(num_vetores, dimensao, num_consultas)
+    exato = faiss.IndexFlatL2(dimensao)
+    exato.add(vetores)
+    _, verdade = exato.search(consultas, k)
+    bytes_float32 = faiss.serialize_index(exato).nbytes
+
+    textos = [f"chunk {i}" for i in range(num_vetores)]
+    metadados = [{"chunk_id": i} for i in range(num_vetores)]
+    resultados = {}
+    for modo in MODOS_COMPACTOS:
+        indice = IndiceCompacto.construir(textos, metadados, vetores, modo)
+        bytes_indice = indice.bytes_em_memoria()["indice"]
+        for rescore in (False, True):
+            acertos = 0
+            for consulta, esperados in zip(consultas, verdade):
+                encontrados = {i for i, _ in indice.buscar(consulta, k=k, rescore=rescore)}
+                acertos += len(encontrados & set(esperados.tolist()))
+            nome = f"{indice.modo}{'+rescore' if rescore else ''}"
+            resultados[nome] = {
+                "recall": acertos / (num_consultas * k),
+                "reducao_memoria": bytes_float32 / bytes_indice,
+            }
+    return resultados
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do sistema RAG")
+    subparsers = parser.add_subparsers(dest="benchmark")
+    parser_cold = subparsers.add_parser("cold-start", help="Tempo de inicialização (padrão)")
+    parser_cold.add_argument("-n", "--repeticoes", type=int, default=5)
+    parser_recall = subparsers.add_parser("recall", help="Recall e memória do índice compacto")
+    parser_recall.add_argument("--vetores", type=int, default=5000)
+    parser_recall.add_argument("--dimensao", type=int, default=1536)
+    parser_recall.add_argument("--consultas", type=int, default=200)
+    parser_recall.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.benchmark == "recall":
+        print(f"🎯 Recall@{args.k} vs. busca exata float32 ({args.vetores} vetores, d={args.dimensao})")
+        print("=" * 60)
+        for nome, r in benchmark_recall(args.vetores, args.dimensao, args.consultas, args.k).items():
+            print(f"{nome:<20} recall={r['recall']:.3f}  memória={r['reducao_memoria']:.1f}x menor")
+        return
+
+    print("⏱️  Cold start (segundos)")
+    print("=" * 60)
+    for nome, tempos in benchmark_cold_start(getattr(args, "repeticoes", 5)).items():
+        print(f"{nome:<20} min={tempos['min']:.3f}  mediana={tempos['mediana']:.3f}  max={tempos['max']:.3f}")
+
+if __name__ == "__main__":
+    main()
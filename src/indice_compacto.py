@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import os
+import sys
+import json
+import logging
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+
+# numpy e faiss são importados sob demanda, como no rag.py, para manter
+# `import rag` leve
+if TYPE_CHECKING:
+    import numpy as np
+    from langchain.schema import Document
+
+logger = logging.getLogger(__name__)
+
+# Modos de armazenamento aceitos; "float32" mantém o índice LangChain original
+MODOS_COMPACTOS = ("float16", "int8", "pq")
+
+ARQUIVO_INDICE = "index_compacto.faiss"
+ARQUIVO_VETORES = "vetores.f32"
+ARQUIVO_TEXTOS = "textos.bin"
+ARQUIVO_OFFSETS = "offsets.npy"
+ARQUIVO_METADADOS = "metadados.json"
+ARQUIVO_CONFIG = "compacto.json"
+ARQUIVOS_COMPACTOS = (ARQUIVO_INDICE, ARQUIVO_VETORES, ARQUIVO_TEXTOS,
+                      ARQUIVO_OFFSETS, ARQUIVO_METADADOS, ARQUIVO_CONFIG)
+
+# Product quantization precisa de ao menos 2**bits vetores para treinar
+PQ_BITS = 8
+PQ_MIN_VETORES = 2 ** PQ_BITS
+
+
+def _criar_indice_faiss(dimensao: int, modo: str, num_vetores: int):
+    """Cria o índice FAISS quantizado correspondente ao modo"""
+    import faiss
+
+    if modo == "pq":
+        if num_vetores < PQ_MIN_VETORES:
+            logger.warning(
+                f"PQ requer ao menos {PQ_MIN_VETORES} vetores para treinar "
+                f"({num_vetores} disponíveis), usando int8"
+            )
+            modo = "int8"
+        else:
+            # Padrão: 2 dimensões por subvetor (códigos 8x menores que float32;
+            # o codebook, ~1,5 MB em d=1536, é fixo e pesa em índices pequenos)
+            subvetores = int(os.getenv("INDEX_PQ_SUBVECTORS", dimensao // 2))
+            indice = faiss.IndexPQ(dimensao, subvetores, PQ_BITS)
+            # Índices pequenos treinam com poucos pontos por centróide
+            indice.pq.cp.min_points_per_centroid = 1
+            return indice, modo
+
+    tipo = faiss.ScalarQuantizer.QT_fp16 if modo == "float16" else faiss.ScalarQuantizer.QT_8bit
+    return faiss.IndexScalarQuantizer(dimensao, tipo, faiss.METRIC_L2), modo
+
+
+def _tamanho_objeto(obj) -> int:
+    """Tamanho aproximado em bytes de listas/dicts Python e seu conteúdo"""
+    tamanho = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        tamanho += sum(_tamanho_objeto(k) + _tamanho_objeto(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        tamanho += sum(_tamanho_objeto(item) for item in obj)
+    return tamanho
+
+
+class IndiceCompacto:
+    """Índice vetorial quantizado com docstore enxuto e re-ranqueamento opcional
+
+    Os vetores ficam na memória apenas na forma quantizada (float16, int8 ou PQ).
+    A cópia em float32 é gravada em disco e lida via memmap somente para
+    re-ranquear os candidatos. O texto dos chunks é guardado uma única vez em
+    um buffer contíguo, indexado por offsets.
+    """
+
+    def __init__(self, indice, modo: str, textos: bytes, offsets: np.ndarray,
+                 metadados: List[Dict[str, Any]], vetores: Optional[np.ndarray] = None):
+        self.indice = indice
+        self.modo = modo
+        self.textos = textos
+        self.offsets = offsets
+        self.metadados = metadados
+        self.vetores = vetores
+
+    @classmethod
+    def construir(cls, textos: List[str], metadados: List[Dict[str, Any]],
+                  vetores: np.ndarray, modo: str = "int8") -> "IndiceCompacto":
+        """Constrói o índice quantizado a partir dos embeddings em float32"""
+        import numpy as np
+
+        if modo not in MODOS_COMPACTOS:
+            raise ValueError(f"Modo de armazenamento inválido: {modo}")
+
+        vetores = np.ascontiguousarray(vetores, dtype=np.float32)
+        indice, modo = _criar_indice_faiss(vetores.shape[1], modo, vetores.shape[0])
+        indice.train(vetores)
+        indice.add(vetores)
+
+        codificados = [t.encode("utf-8") for t in textos]
+        offsets = np.zeros(len(codificados) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(c) for c in codificados])
+
+        return cls(indice, modo, b"".join(codificados), offsets, list(metadados), vetores)
+
+    def salvar(self, caminho: str) -> None:
+        """Grava o índice, os vetores float32, o buffer de textos e os metadados"""
+        import faiss
+        import numpy as np
+
+        os.makedirs(caminho, exist_ok=True)
+        faiss.write_index(self.indice, os.path.join(caminho, ARQUIVO_INDICE))
+        if self.vetores is not None:
+            self.vetores.tofile(os.path.join(caminho, ARQUIVO_VETORES))
+        with open(os.path.join(caminho, ARQUIVO_TEXTOS), "wb") as f:
+            f.write(self.textos)
+        np.save(os.path.join(caminho, ARQUIVO_OFFSETS), self.offsets)
+        with open(os.path.join(caminho, ARQUIVO_METADADOS), "w", encoding="utf-8") as f:
+            json.dump(self.metadados, f, ensure_ascii=False)
+        with open(os.path.join(caminho, ARQUIVO_CONFIG), "w", encoding="utf-8") as f:
+            json.dump({"modo": self.modo, "dimensao": self.indice.d, "total": self.indice.ntotal}, f)
+
+    @classmethod
+    def carregar(cls, caminho: str) -> "IndiceCompacto":
+        """Carrega o índice; os vetores float32 são mapeados em memória, não lidos"""
+        import faiss
+        import numpy as np
+
+        with open(os.path.join(caminho, ARQUIVO_CONFIG), "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+        indice = faiss.read_index(os.path.join(caminho, ARQUIVO_INDICE))
+        with open(os.path.join(caminho, ARQUIVO_TEXTOS), "rb") as f:
+            textos = f.read()
+        offsets = np.load(os.path.join(caminho, ARQUIVO_OFFSETS))
+        with open(os.path.join(caminho, ARQUIVO_METADADOS), "r", encoding="utf-8") as f:
+            metadados = json.load(f)
+
+        vetores = None
+        arquivo_vetores = os.path.join(caminho, ARQUIVO_VETORES)
+        if os.path.exists(arquivo_vetores):
+            vetores = np.memmap(arquivo_vetores, dtype=np.float32, mode="r",
+                                shape=(config["total"], config["dimensao"]))
+
+        return cls(indice, config["modo"], textos, offsets, metadados, vetores)
+
+    @staticmethod
+    def existe(caminho: str) -> bool:
+        """Verifica se há um índice compacto salvo no caminho"""
+        return all(
+            os.path.exists(os.path.join(caminho, nome))
+            for nome in (ARQUIVO_INDICE, ARQUIVO_TEXTOS, ARQUIVO_OFFSETS, ARQUIVO_METADADOS, ARQUIVO_CONFIG)
+        )
+
+    def __len__(self) -> int:
+        return len(self.metadados)
+
+    def texto(self, i: int) -> str:
+        """Retorna o texto do chunk i a partir do buffer contíguo"""
+        return self.textos[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def documento(self, i: int) -> Document:
+        """Reconstrói o Document do chunk i"""
+        from langchain.schema import Document
+        return Document(page_content=self.texto(i), metadata=dict(self.metadados[i]))
+
+    def buscar(self, vetor_consulta, k: int = 4, rescore: bool = True,
+               fator_candidatos: int = 4) -> List[Tuple[int, float]]:
+        """Busca os k vizinhos mais próximos, re-ranqueando com os vetores float32
+
+        Com rescore ativo, busca k * fator_candidatos candidatos no índice
+        quantizado e recalcula a distância L2 exata apenas para eles.
+        """
+        import numpy as np
+
+        consulta = np.asarray(vetor_consulta, dtype=np.float32).reshape(1, -1)
+        usar_rescore = rescore and self.vetores is not None
+        n_candidatos = min(k * fator_candidatos if usar_rescore else k, self.indice.ntotal)
+        if n_candidatos <= 0:
+            return []
+
+        distancias, ids = self.indice.search(consulta, n_candidatos)
+        validos = ids[0] >= 0
+        ids, distancias = ids[0][validos], distancias[0][validos]
+
+        if usar_rescore and len(ids):
+            # Lê só as linhas necessárias do memmap, em ordem crescente de offset
+            ordem = np.argsort(ids)
+            exatos = np.asarray(self.vetores[ids[ordem]])
+            dist_exatas = np.empty(len(ids), dtype=np.float32)
+            dist_exatas[ordem] = ((exatos - consulta) ** 2).sum(axis=1)
+            distancias = dist_exatas
+            melhores = np.argsort(distancias)[:k]
+            ids, distancias = ids[melhores], distancias[melhores]
+
+        return [(int(i), float(d)) for i, d in zip(ids[:k], distancias[:k])]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4,
+                                    rescore: bool = True) -> List[Document]:
+        """Mesma interface do FAISS do LangChain para busca por vetor"""
+        return [self.documento(i) for i, _ in self.buscar(embedding, k=k, rescore=rescore)]
+
+    def bytes_em_memoria(self) -> Dict[str, int]:
+        """Estimativa do uso de memória residente por componente
+
+        "indice" é o tamanho serializado do índice FAISS: códigos mais
+        codebook do PQ / parâmetros do quantizador.
+        """
+        import faiss
+
+        return {
+            "indice": int(faiss.serialize_index(self.indice).nbytes),
+            "textos": len(self.textos),
+            "offsets": int(self.offsets.nbytes),
+            "metadados": _tamanho_objeto(self.metadados),
+        }
+
+
+_retriever_compacto_cls = None
+
+
+def _classe_retriever_compacto():
+    """Cria (uma única vez) a classe de retriever LangChain do índice compacto"""
+    global _retriever_compacto_cls
+    if _retriever_compacto_cls is None:
+        from langchain.schema import BaseRetriever
+
+        class RetrieverCompacto(BaseRetriever):
+            indice: Any
+            embeddings: Any
+            k: int = 4
+            rescore: bool = True
+
+            def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+                vetor = self.embeddings.embed_query(query)
+                return [self.indice.documento(i) for i, _ in self.indice.buscar(vetor, k=self.k, rescore=self.rescore)]
+
+        _retriever_compacto_cls = RetrieverCompacto
+    return _retriever_compacto_cls
+
+
+def criar_retriever(indice: IndiceCompacto, embeddings, k: int = 4, rescore: bool = True):
+    """Cria um retriever LangChain sobre o índice compacto"""
+    return _classe_retriever_compacto()(indice=indice, embeddings=embeddings, k=k, rescore=rescore)
@@ -1,8 +1,17 @@
-from langgraph import graph
-from langgraph.graph import StateGraph, START, END
+# Nenhuma dependência pesada (LangGraph, LangChain, Azure) é importada aqui:
+# elas são carregadas sob demanda pelo rag.DocumentProcessor.
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Annotated
+from typing import List, Dict, Any, Optional
+from concurrent.futures import Future
+import argparse
+import asyncio
+import logging
 import os
+import signal
+import sys
+import threading
+
+from rag import INDEX_PATH, DocumentProcessor, indice_existe, ler_metadados_indice
 
 @dataclass
 class EstadoFluxo:
@@ -17,12 +26,7 @@ class EstadoFluxo:
 
 def verificar_indice_node(estado: EstadoFluxo) -> Dict[str, Any]:
     """Verifica se o índice FAISS existe"""
-    import os
-    INDEX_PATH = "/home/gacoelho/Documents/agente_emisssao_documento/doc"
-    index_faiss = os.path.join(INDEX_PATH, "index.faiss")
-    index_pkl = os.path.join(INDEX_PATH, "index.pkl")
-
-    estado.indice_existe = os.path.exists(index_faiss) and os.path.exists(index_pkl)
+    estado.indice_existe = indice_existe()
     print(f"[Verificar Índice] Índice existe? {estado.indice_existe}")
     return {"estado": estado}
 
@@ -30,7 +34,6 @@ def criar_indice_node(estado: EstadoFluxo) -> Dict[str, Any]:
     """Cria o índice FAISS se não existir"""
     print("[Criar Índice] Criando índice FAISS com documentos...")
     try:
-        from rag import DocumentProcessor
         processor = DocumentProcessor()
         success = processor.criar_indice_faiss()
         estado.indice_existe = success
@@ -51,7 +54,6 @@ def buscar_documentos_rag_node(estado: EstadoFluxo) -> Dict[str, Any]:
     """Busca documentos relevantes usando RAG"""
     print(f"[RAG] Buscando documentos para: '{estado.pergunta_usuario}'")
     try:
-        from rag import DocumentProcessor
         processor = DocumentProcessor()
         
         # Buscar documentos similares
@@ -127,7 +129,6 @@ def executar_consulta_rag_node(estado: EstadoFluxo) -> Dict[str, Any]:
     print(f"[RAG] Executando consulta no documento: {estado.documento_escolhido['arquivo']}")
     
     try:
-        from rag import DocumentProcessor
         processor = DocumentProcessor()
         
         # Executar RAG com o documento específico
@@ -157,6 +158,260 @@ def apresentar_resultado_node(estado: EstadoFluxo) -> Dict[str, Any]:
     
     return {"estado": estado}
 
+def mostrar_estatisticas() -> int:
+    """Mostra os metadados pré-computados do índice sem carregar o LangChain"""
+    meta = ler_metadados_indice()
+    if meta is None:
+        print(f"❌ Metadados do índice não encontrados em {INDEX_PATH}")
+        print("🔄 Execute `python main.py` para gravá-los: o índice existente é carregado")
+        print("   e seus metadados são salvos (o índice é criado via OCR se ainda não existir)")
+        return 1
+    
+    print("📊 Estatísticas do índice")
+    print("=" * 60)
+    print(f"📁 Caminho: {meta.get('caminho_indice', INDEX_PATH)}")
+    print(f"🧩 Chunks: {meta.get('total_documentos', 0)}")
+    print(f"📄 Arquivos únicos: {meta.get('arquivos_unicos', 0)}")
+    print(f"🏷️  Tipos: {', '.join(meta.get('tipos_arquivo', []))}")
+    print(f"🗜️  Armazenamento: {meta.get('modo_armazenamento', 'float32')}")
+    print(f"🕒 Última atualização: {meta.get('ultima_atualizacao', 'desconhecida')}")
+    return 0
+
+def criar_parser() -> argparse.ArgumentParser:
+    """Cria o parser de linha de comando"""
+    parser = argparse.ArgumentParser(description="Sistema de Consulta RAG")
+    subparsers = parser.add_subparsers(dest="comando")
+    subparsers.add_parser("consultar", help="Modo interativo de consulta (padrão)")
+    subparsers.add_parser("stats", help="Mostra estatísticas do índice sem carregar o LangChain")
+    return parser
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    """Ponto de entrada da linha de comando"""
+    args = criar_parser().parse_args(argv)
+    if args.comando == "stats":
+        return mostrar_estatisticas()
+    main()
+    return 0
+
+# Bytes lidos de stdin que ainda não formaram uma linha completa
+_buffer_stdin = bytearray()
+
+# Fallback sem add_reader (p.ex. Windows): leitura em thread; se um Ctrl+C
+# interromper o prompt, a thread continua bloqueada em input() e a linha
+# seguinte é entregue ao próximo prompt
+_leitura: Optional[Future] = None
+
+def _extrair_linha() -> Optional[str]:
+    """Retira a primeira linha completa de _buffer_stdin, se houver"""
+    fim = _buffer_stdin.find(b"\n")
+    if fim < 0:
+        return None
+    linha = bytes(_buffer_stdin[:fim])
+    del _buffer_stdin[:fim + 1]
+    return linha.decode("utf-8", errors="replace").rstrip("\r")
+
+def _ler_com_reader(loop: asyncio.AbstractEventLoop, prompt: str):
+    """Lê uma linha de stdin pelo event loop (POSIX), sem threads
+    
+    Levanta NotImplementedError/OSError/ValueError se stdin não puder ser
+    monitorado pelo loop.
+    """
+    fd = sys.stdin.fileno()
+    pronto = loop.create_future()
+    
+    linha = _extrair_linha()
+    if linha is not None:
+        print(prompt, end="", flush=True)
+        pronto.set_result(linha)
+        return pronto, lambda: None
+    
+    def ao_ler():
+        dados = os.read(fd, 4096)
+        if pronto.done():
+            _buffer_stdin.extend(dados)
+            return
+        if not dados:
+            # EOF: devolve o que sobrou, como input(), ou EOFError
+            if _buffer_stdin:
+                resto = bytes(_buffer_stdin)
+                _buffer_stdin.clear()
+                pronto.set_result(resto.decode("utf-8", errors="replace"))
+            else:
+                pronto.set_exception(EOFError())
+            return
+        _buffer_stdin.extend(dados)
+        linha = _extrair_linha()
+        if linha is not None:
+            pronto.set_result(linha)
+    
+    loop.add_reader(fd, ao_ler)
+    print(prompt, end="", flush=True)
+    return pronto, lambda: loop.remove_reader(fd)
+
+def _ler_stdin(prompt: str, futuro: Future) -> None:
+    try:
+        futuro.set_result(input(prompt))
+    except BaseException as e:
+        futuro.set_exception(e)
+
+def _ler_com_thread(prompt: str):
+    """Lê uma linha de stdin em uma thread daemon"""
+    global _leitura
+    if _leitura is None or _leitura.done():
+        _leitura = Future()
+        threading.Thread(target=_ler_stdin, args=(prompt, _leitura), daemon=True).start()
+    else:
+        print(prompt, end="", flush=True)
+    return asyncio.wrap_future(_leitura), lambda: None
+
+def _instalar_sigint(loop: asyncio.AbstractEventLoop, interrupcao: asyncio.Future):
+    """Faz o Ctrl+C resolver `interrupcao`; retorna a função que desfaz isso"""
+    def ao_interromper():
+        if not interrupcao.done():
+            interrupcao.set_result(None)
+    
+    try:
+        loop.add_signal_handler(signal.SIGINT, ao_interromper)
+    except (NotImplementedError, RuntimeError):
+        # Sem suporte (p.ex. Windows): o Ctrl+C encerra o loop como antes
+        return lambda: None
+    return lambda: loop.remove_signal_handler(signal.SIGINT)
+
+async def _ainput(prompt: str) -> str:
+    """input() que não bloqueia o event loop enquanto o usuário digita
+    
+    Como input(), levanta KeyboardInterrupt se o usuário apertar Ctrl+C.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        leitura, parar = _ler_com_reader(loop, prompt)
+    except (NotImplementedError, OSError, ValueError):
+        leitura, parar = _ler_com_thread(prompt)
+    
+    interrupcao = loop.create_future()
+    remover_sigint = _instalar_sigint(loop, interrupcao)
+    try:
+        await asyncio.wait({leitura, interrupcao}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        parar()
+        remover_sigint()
+    
+    if leitura.done():
+        return leitura.result()
+    raise KeyboardInterrupt
+
+async def _consultar(processor: DocumentProcessor, pergunta: str) -> None:
+    """Busca, escolha do documento e consulta RAG de uma pergunta"""
+    print("[RAG] Buscando documentos relevantes...")
+    docs = await processor.abuscar_documentos_similares(pergunta, max_results=5)
+    
+    if not docs:
+        print("❌ Nenhum documento relevante encontrado.")
+        return
+    
+    # Consulta especulativa no documento mais relevante enquanto o usuário escolhe
+    especulativa = asyncio.create_task(processor.aexecutar_rag(pergunta, documento=docs[0]))
+    
+    try:
+        # Mostrar documentos encontrados
+        print(f"\n🔍 Encontrei {len(docs)} documentos relevantes:")
+        print("=" * 80)
+        
+        for i, doc in enumerate(docs, 1):
+            arquivo = doc.metadata.get("arquivo", "Desconhecido")
+            chunk_id = doc.metadata.get("chunk_id", 0)
+            tipo = doc.metadata.get("tipo_arquivo", "desconhecido")
+            resumo = doc.page_content[:300].replace("\n", " ").strip()
+            
+            print(f"{i}. 📄 {arquivo}")
+            print(f"   📍 Chunk {chunk_id} | Tipo: {tipo}")
+            print(f"   📝 {resumo}...")
+            print()
+        
+        # Escolher documento
+        if len(docs) > 1:
+            while True:
+                try:
+                    escolha = (await _ainput(f"🎯 Escolha um documento (1-{len(docs)}) ou 'auto' para o mais relevante: ")).strip()
+                    
+                    if escolha.lower() == 'auto':
+                        doc_escolhido = docs[0]
+                        print(f"✅ Documento escolhido automaticamente: {doc_escolhido.metadata.get('arquivo', 'Desconhecido')}")
+                        break
+                    
+                    if escolha.isdigit() and 1 <= int(escolha) <= len(docs):
+                        idx = int(escolha) - 1
+                        doc_escolhido = docs[idx]
+                        print(f"✅ Documento escolhido: {doc_escolhido.metadata.get('arquivo', 'Desconhecido')}")
+                        break
+                    else:
+                        print("❌ Opção inválida, tente novamente.")
+                except KeyboardInterrupt:
+                    print("\n👋 Operação cancelada")
+                    doc_escolhido = docs[0]
+                    break
+        else:
+            doc_escolhido = docs[0]
+            print(f"✅ Documento único encontrado: {doc_escolhido.metadata.get('arquivo', 'Desconhecido')}")
+        
+        # Executar consulta RAG, reaproveitando a especulativa se o documento for o mesmo
+        print(f"\n[RAG] Executando consulta no documento escolhido...")
+        if doc_escolhido is docs[0]:
+            resposta = await especulativa
+        else:
+            especulativa.cancel()
+            resposta = await processor.aexecutar_rag(pergunta, documento=doc_escolhido)
+    finally:
+        if not especulativa.done():
+            especulativa.cancel()
+    
+    # Apresentar resultado
+    print("\n" + "=" * 80)
+    print("📋 RESULTADO DA CONSULTA")
+    print("=" * 80)
+    print(f"🔍 Pergunta: {pergunta}")
+    print(f"📄 Documento: {doc_escolhido.metadata.get('arquivo', 'Desconhecido')}")
+    print(f"📍 Chunk: {doc_escolhido.metadata.get('chunk_id', 0)}")
+    print("-" * 80)
+    print(resposta)
+    print("=" * 80)
+
+async def _main_async(processor: DocumentProcessor) -> None:
+    """Loop principal de consulta sobre o pipeline assíncrono"""
+    try:
+        while True:
+            try:
+                # Coletar pergunta
+                pergunta = (await _ainput("\n👤 Digite sua pergunta sobre documentos (ou 'sair' para encerrar): ")).strip()
+                
+                if pergunta.lower() in ['sair', 'exit', 'quit']:
+                    print("👋 Encerrando sistema...")
+                    break
+                
+                if not pergunta:
+                    continue
+                
+                print(f"[Pergunta] Processando: {pergunta}")
+                
+                try:
+                    await _consultar(processor, pergunta)
+                except Exception as e:
+                    print(f"❌ Erro ao processar consulta: {str(e)}")
+                
+                # Perguntar se quer continuar
+                continuar = (await _ainput("\n🔄 Fazer nova consulta? (s/n): ")).strip().lower()
+                if continuar not in ['s', 'sim', 'y', 'yes']:
+                    print("👋 Encerrando sistema...")
+                    break
+                    
+            except KeyboardInterrupt:
+                print("\n\n👋 Sistema encerrado pelo usuário")
+                break
+            except Exception as e:
+                print(f"\n❌ Erro inesperado: {str(e)}")
+    finally:
+        await processor.afechar()
+
 def main():
     """Função principal com fluxo LangGraph simplificado"""
     print("🤖 Sistema de Consulta RAG - LangGraph")
@@ -167,20 +422,16 @@ def main():
     
     # Estado inicial
     estado = EstadoFluxo()
+    processor = DocumentProcessor()
     
     # Verificar índice
     if not estado.indice_existe:
         print("[Verificar Índice] Verificando se o índice existe...")
-        INDEX_PATH = "/home/gacoelho/Documents/agente_emisssao_documento/doc"
-        index_faiss = os.path.join(INDEX_PATH, "index.faiss")
-        index_pkl = os.path.join(INDEX_PATH, "index.pkl")
-        estado.indice_existe = os.path.exists(index_faiss) and os.path.exists(index_pkl)
+        estado.indice_existe = indice_existe()
         
         if not estado.indice_existe:
             print("[Criar Índice] Criando índice FAISS...")
             try:
-                from rag import DocumentProcessor
-                processor = DocumentProcessor()
                 success = processor.criar_indice_faiss()
                 estado.indice_existe = success
             except Exception as e:
@@ -191,104 +442,24 @@ def main():
     print("🔍 O sistema criará automaticamente o índice FAISS se necessário")
     print("-" * 60)
     
-    # Loop principal de consulta
-    while True:
-        try:
-            # Coletar pergunta
-            pergunta = input("\n👤 Digite sua pergunta sobre documentos (ou 'sair' para encerrar): ").strip()
-            
-            if pergunta.lower() in ['sair', 'exit', 'quit']:
-                print("👋 Encerrando sistema...")
-                break
-            
-            if not pergunta:
-                continue
-            
-            estado.pergunta_usuario = pergunta
-            print(f"[Pergunta] Processando: {pergunta}")
-            
-            # Buscar documentos
-            print("[RAG] Buscando documentos relevantes...")
-            try:
-                from rag import DocumentProcessor
-                processor = DocumentProcessor()
-                
-                docs = processor.buscar_documentos_similares(pergunta, max_results=5)
-                
-                if not docs:
-                    print("❌ Nenhum documento relevante encontrado.")
-                    continue
-                
-                # Mostrar documentos encontrados
-                print(f"\n🔍 Encontrei {len(docs)} documentos relevantes:")
-                print("=" * 80)
-                
-                for i, doc in enumerate(docs, 1):
-                    arquivo = doc.metadata.get("arquivo", "Desconhecido")
-                    chunk_id = doc.metadata.get("chunk_id", 0)
-                    tipo = doc.metadata.get("tipo_arquivo", "desconhecido")
-                    resumo = doc.page_content[:300].replace("\n", " ").strip()
-                    
-                    print(f"{i}. 📄 {arquivo}")
-                    print(f"   📍 Chunk {chunk_id} | Tipo: {tipo}")
-                    print(f"   📝 {resumo}...")
-                    print()
-                
-                # Escolher documento
-                if len(docs) > 1:
-                    while True:
-                        try:
-                            escolha = input(f"🎯 Escolha um documento (1-{len(docs)}) ou 'auto' para o mais relevante: ").strip()
-                            
-                            if escolha.lower() == 'auto':
-                                doc_escolhido = docs[0]
-                                print(f"✅ Documento escolhido automaticamente: {doc_escolhido.metadata.get('arquivo', 'Desconhecido')}")
-                                break
-                            
-                            if escolha.isdigit() and 1 <= int(escolha) <= len(docs):
-                                idx = int(escolha) - 1
-                                doc_escolhido = docs[idx]
-                                print(f"✅ Documento escolhido: {doc_escolhido.metadata.get('arquivo', 'Desconhecido')}")
-                                break
-                            else:
-                                print("❌ Opção inválida, tente novamente.")
-                        except KeyboardInterrupt:
-                            print("\n👋 Operação cancelada")
-                            doc_escolhido = docs[0]
-                            break
-                else:
-                    doc_escolhido = docs[0]
-                    print(f"✅ Documento único encontrado: {doc_escolhido.metadata.get('arquivo', 'Desconhecido')}")
-                
-                # Executar consulta RAG
-                print(f"\n[RAG] Executando consulta no documento escolhido...")
-                resposta = processor.executar_rag(pergunta, max_results=1, auto_clarify=False)
-                
-                # Apresentar resultado
-                print("\n" + "=" * 80)
-                print("📋 RESULTADO DA CONSULTA")
-                print("=" * 80)
-                print(f"🔍 Pergunta: {pergunta}")
-                print(f"📄 Documento: {doc_escolhido.metadata.get('arquivo', 'Desconhecido')}")
-                print(f"📍 Chunk: {doc_escolhido.metadata.get('chunk_id', 0)}")
-                print("-" * 80)
-                print(resposta)
-                print("=" * 80)
-                
-            except Exception as e:
-                print(f"❌ Erro ao processar consulta: {str(e)}")
-            
-            # Perguntar se quer continuar
-            continuar = input("\n🔄 Fazer nova consulta? (s/n): ").strip().lower()
-            if continuar not in ['s', 'sim', 'y', 'yes']:
-                print("👋 Encerrando sistema...")
-                break
-                
-        except KeyboardInterrupt:
-            print("\n\n👋 Sistema encerrado pelo usuário")
-            break
-        except Exception as e:
-            print(f"\n❌ Erro inesperado: {str(e)}")
+    # Clientes e índice aquecem enquanto o usuário digita a primeira pergunta
+    processor.aquecer_em_segundo_plano()
+    
+    # Loop principal de consulta, em um único event loop para reaproveitar
+    # as conexões HTTP entre perguntas
+    try:
+        asyncio.run(_main_async(processor))
+    except KeyboardInterrupt:
+        print("\n\n👋 Sistema encerrado pelo usuário")
+    
+    if _leitura is not None and not _leitura.done():
+        # Só no fallback em thread: ela ainda está bloqueada em input() após um
+        # Ctrl+C e, com stdin não interativo, segura o lock do buffer e aborta
+        # o interpretador na finalização; encerramos sem esperar por ela
+        logging.shutdown()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(0)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(cli())
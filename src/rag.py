@@ -1,15 +1,23 @@
+from __future__ import annotations
+
 import os
+import json
+import time
+import asyncio
+from concurrent.futures import Future
+import threading
 import dotenv
-from langchain_community.vectorstores import FAISS
-from langchain_openai import AzureOpenAIEmbeddings, AzureChatOpenAI
-from langchain.schema import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
-from ocr import tool_ocr
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union, TYPE_CHECKING
 import logging
 
+from indice_compacto import IndiceCompacto, ARQUIVOS_COMPACTOS, MODOS_COMPACTOS, criar_retriever
+
+# LangChain, OpenAI e o SDK da Azure são importados sob demanda dentro dos
+# métodos que os usam, para que `import rag` (e o comando `stats`) seja rápido.
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import FAISS
+    from langchain.schema import Document
+
 dotenv.load_dotenv()
 
 # Configurar logging
@@ -17,34 +25,195 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 INDEX_PATH = "/home/gacoelho/Documents/agente_emisssao_documento/doc"
+INDEX_META = "index_meta.json"
+
+# Limites do pool de conexões HTTP compartilhado pelos clientes assíncronos
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+
+PROMPT_RAG = """Você é um assistente especializado em documentos que ajuda usuários a entender o conteúdo de documentos.
+
+📋 **Conteúdo do documento:**
+{context}
+
+❓ **Pergunta do usuário:** {question}
+
+💡 **Instruções:**
+Baseado APENAS no contexto fornecido, responda à pergunta do usuário de forma clara e precisa.
+- Se a informação estiver disponível no contexto, forneça uma resposta completa
+- Se a informação NÃO estiver disponível no contexto, indique claramente isso
+- Seja profissional, objetivo e direto ao ponto
+- Use o contexto específico do documento para fundamentar sua resposta
+
+🔍 **Resposta baseada no documento:**"""
+
+# "float32" (índice LangChain padrão), "float16", "int8" ou "pq"
+INDEX_STORAGE_MODE = os.getenv("INDEX_STORAGE_MODE", "float32").lower()
+if INDEX_STORAGE_MODE != "float32" and INDEX_STORAGE_MODE not in MODOS_COMPACTOS:
+    logger.warning(
+        f"INDEX_STORAGE_MODE inválido: '{INDEX_STORAGE_MODE}' "
+        f"(use float32, {', '.join(MODOS_COMPACTOS)}); usando float32"
+    )
+    INDEX_STORAGE_MODE = "float32"
+
+# Re-ranqueamento exato (vetores float32 via memmap) dos candidatos do índice compacto
+INDEX_RESCORE = os.getenv("INDEX_RESCORE", "true").lower() not in ("0", "false", "no", "nao", "não")
+
+
+def modo_compacto(modo: str = INDEX_STORAGE_MODE) -> bool:
+    """Indica se o modo de armazenamento usa o índice compacto"""
+    return modo in MODOS_COMPACTOS
+
+
+def indice_existe(caminho: str = INDEX_PATH, modo: str = INDEX_STORAGE_MODE) -> bool:
+    """Verifica se o índice do modo de armazenamento configurado já foi criado"""
+    if modo_compacto(modo):
+        return IndiceCompacto.existe(caminho)
+    return (os.path.exists(os.path.join(caminho, "index.faiss"))
+            and os.path.exists(os.path.join(caminho, "index.pkl")))
+
+
+def ler_metadados_indice(caminho: str = INDEX_PATH) -> Optional[Dict[str, Any]]:
+    """Lê os metadados pré-computados do índice sem carregar o LangChain"""
+    arquivo_meta = os.path.join(caminho, INDEX_META)
+    if not os.path.exists(arquivo_meta):
+        return None
+    try:
+        with open(arquivo_meta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Erro ao ler metadados do índice: {str(e)}")
+        return None
+
+
+def _modo_do_indice(vectorstore: Union[FAISS, IndiceCompacto]) -> str:
+    """Modo de armazenamento efetivo do índice (o PQ pode cair para int8)"""
+    return vectorstore.modo if isinstance(vectorstore, IndiceCompacto) else "float32"
+
+
+def _salvar_metadados_indice(metadados: List[Dict[str, Any]], modo: str,
+                             caminho: str = INDEX_PATH) -> None:
+    """Grava os metadados do índice ao lado de index.faiss/index.pkl"""
+    arquivos = sorted({metadata.get("arquivo", "desconhecido") for metadata in metadados})
+    tipos = sorted({metadata.get("tipo_arquivo", "desconhecido") for metadata in metadados})
+    meta = {
+        "total_documentos": len(metadados),
+        "arquivos_unicos": len(arquivos),
+        "arquivos": arquivos,
+        "tipos_arquivo": tipos,
+        "modo_armazenamento": modo,
+        "caminho_indice": caminho,
+        "ultima_atualizacao": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(os.path.join(caminho, INDEX_META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
 
 class DocumentProcessor:
     """Classe para processar e gerenciar documentos com desambiguação inteligente"""
     
     def __init__(self):
-        self.embeddings = AzureOpenAIEmbeddings(
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            api_key=os.getenv("AZURE_OPENAI_KEY"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-            model=os.getenv("EMBEDDINGS_MODEL_NAME", "text-embedding-ada-002")
-        )
-        
-        self.llm = AzureChatOpenAI(
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            deployment_name=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
-            api_key=os.getenv("AZURE_OPENAI_KEY"),
-            temperature=0.3
-        )
-        
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,
-        )
+        # Clientes e índice são criados na primeira utilização (ou por aquecer())
+        self._embeddings = None
+        self._llm = None
+        self._text_splitter = None
+        self._futuro_indice: Optional[Future] = None
+        self._http_async_client = None
+        # Um lock por recurso, segurado só para decidir quem cria; a carga do
+        # índice acontece fora dele e é publicada por _futuro_indice
+        self._lock_http = threading.Lock()
+        self._lock_embeddings = threading.Lock()
+        self._lock_llm = threading.Lock()
+        self._lock_text_splitter = threading.Lock()
+        self._lock_indice = threading.Lock()
+    
+    @property
+    def http_async_client(self):
+        """Sessão httpx assíncrona com pool de conexões, compartilhada pelos clientes"""
+        cliente = self._http_async_client
+        if cliente is None:
+            with self._lock_http:
+                if self._http_async_client is None:
+                    import httpx
+                    self._http_async_client = httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=HTTP_MAX_KEEPALIVE
+                        )
+                    )
+                cliente = self._http_async_client
+        return cliente
+    
+    @property
+    def embeddings(self):
+        """Cliente de embeddings Azure OpenAI, criado sob demanda"""
+        cliente = self._embeddings
+        if cliente is None:
+            with self._lock_embeddings:
+                if self._embeddings is None:
+                    from langchain_openai import AzureOpenAIEmbeddings
+                    self._embeddings = AzureOpenAIEmbeddings(
+                        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+                        api_key=os.getenv("AZURE_OPENAI_KEY"),
+                        api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+                        model=os.getenv("EMBEDDINGS_MODEL_NAME", "text-embedding-ada-002"),
+                        http_async_client=self.http_async_client
+                    )
+                cliente = self._embeddings
+        return cliente
+    
+    @property
+    def llm(self):
+        """Cliente de chat Azure OpenAI, criado sob demanda"""
+        cliente = self._llm
+        if cliente is None:
+            with self._lock_llm:
+                if self._llm is None:
+                    from langchain_openai import AzureChatOpenAI
+                    self._llm = AzureChatOpenAI(
+                        api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+                        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+                        deployment_name=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
+                        api_key=os.getenv("AZURE_OPENAI_KEY"),
+                        temperature=0.3,
+                        http_async_client=self.http_async_client
+                    )
+                cliente = self._llm
+        return cliente
+    
+    @property
+    def text_splitter(self):
+        """Divisor de texto em chunks, criado sob demanda"""
+        with self._lock_text_splitter:
+            if self._text_splitter is None:
+                from langchain.text_splitter import RecursiveCharacterTextSplitter
+                self._text_splitter = RecursiveCharacterTextSplitter(
+                    chunk_size=1000,
+                    chunk_overlap=200,
+                    length_function=len,
+                )
+            return self._text_splitter
+    
+    def aquecer(self) -> bool:
+        """Cria os clientes e carrega o índice antecipadamente (usado em thread de fundo)"""
+        try:
+            self.embeddings
+            self.llm
+            return self.carregar_indice() is not None
+        except Exception as e:
+            logger.error(f"Erro ao aquecer o processador: {str(e)}")
+            return False
+    
+    def aquecer_em_segundo_plano(self) -> threading.Thread:
+        """Dispara aquecer() em uma thread daemon e retorna a thread"""
+        thread = threading.Thread(target=self.aquecer, name="aquecer-rag", daemon=True)
+        thread.start()
+        return thread
     
     def extrair_documentos_por_ocr(self, pasta_docs: str) -> List[Document]:
         """Extrai texto de documentos na pasta via OCR e retorna lista de Documentos"""
+        from langchain.schema import Document
+        from ocr import tool_ocr
+        
         documentos = []
         
         if not os.path.exists(pasta_docs):
@@ -99,6 +268,15 @@ class DocumentProcessor:
     
     def criar_indice_faiss(self) -> bool:
         """Cria índice FAISS a partir dos documentos extraídos via OCR"""
+        vectorstore = self._construir_indice()
+        if vectorstore is None:
+            return False
+        
+        self._publicar_indice(vectorstore)
+        return True
+    
+    def _construir_indice(self) -> Optional[Union[FAISS, IndiceCompacto]]:
+        """Extrai os documentos via OCR, cria e salva o índice e o retorna"""
         logger.info("Criando índice FAISS via OCR dos documentos na pasta...")
         
         try:
@@ -106,48 +284,137 @@ class DocumentProcessor:
             
             if not docs:
                 logger.warning("Nenhum documento extraído via OCR para criar índice.")
-                return False
+                return None
             
             logger.info(f"{len(docs)} chunks de documentos processados")
             
-            # Criar o índice FAISS
-            vectorstore = FAISS.from_documents(docs, self.embeddings)
-            
-            # Salvar o índice
             os.makedirs(INDEX_PATH, exist_ok=True)
-            vectorstore.save_local(INDEX_PATH)
+            
+            if modo_compacto():
+                # Índice quantizado + docstore enxuto; os vetores float32 ficam
+                # só em disco e são mapeados em memória para o re-ranqueamento
+                import numpy as np
+                textos = [doc.page_content for doc in docs]
+                vetores = np.array(self.embeddings.embed_documents(textos), dtype=np.float32)
+                compacto = IndiceCompacto.construir(
+                    textos, [doc.metadata for doc in docs], vetores, INDEX_STORAGE_MODE
+                )
+                compacto.salvar(INDEX_PATH)
+                del compacto, vetores
+                vectorstore = IndiceCompacto.carregar(INDEX_PATH)
+            else:
+                # Criar o índice FAISS
+                from langchain_community.vectorstores import FAISS
+                vectorstore = FAISS.from_documents(docs, self.embeddings)
+                vectorstore.save_local(INDEX_PATH)
+            
+            # Metadados usados pelo comando `stats`
+            _salvar_metadados_indice([doc.metadata for doc in docs], _modo_do_indice(vectorstore))
             
             logger.info(f"Índice FAISS criado e salvo em {INDEX_PATH}")
-            return True
+            return vectorstore
             
         except Exception as e:
             logger.error(f"Erro ao criar índice FAISS: {str(e)}")
-            return False
+            return None
     
-    def carregar_indice(self) -> Optional[FAISS]:
-        """Carrega o índice FAISS existente ou cria um novo se necessário"""
+    def _publicar_indice(self, vectorstore: Optional[Union[FAISS, IndiceCompacto]]) -> None:
+        """Publica um índice já pronto para carregar_indice()"""
+        futuro = Future()
+        futuro.set_result(vectorstore)
+        with self._lock_indice:
+            self._futuro_indice = futuro
+    
+    def carregar_indice(self) -> Optional[Union[FAISS, IndiceCompacto]]:
+        """Carrega o índice FAISS existente ou cria um novo se necessário
+        
+        Só uma thread carrega; as demais esperam o resultado em _futuro_indice,
+        sem segurar nenhum lock durante a carga.
+        """
+        with self._lock_indice:
+            futuro = self._futuro_indice
+            responsavel = futuro is None
+            if responsavel:
+                futuro = self._futuro_indice = Future()
+        
+        if not responsavel:
+            return futuro.result()
+        
         try:
-            index_faiss = os.path.join(INDEX_PATH, "index.faiss")
-            index_pkl = os.path.join(INDEX_PATH, "index.pkl")
-            
-            if not (os.path.exists(index_faiss) and os.path.exists(index_pkl)):
+            vectorstore = self._carregar_ou_criar_indice()
+        except BaseException as e:
+            # KeyboardInterrupt/SystemExit: libera quem espera e permite nova tentativa
+            self._descartar_futuro_indice(futuro)
+            futuro.set_exception(e)
+            raise
+        
+        if vectorstore is None:
+            # Permite nova tentativa na próxima chamada
+            self._descartar_futuro_indice(futuro)
+        futuro.set_result(vectorstore)
+        return vectorstore
+    
+    def _descartar_futuro_indice(self, futuro: Future) -> None:
+        """Remove o futuro de carga do índice, se ainda for o atual"""
+        with self._lock_indice:
+            if self._futuro_indice is futuro:
+                self._futuro_indice = None
+    
+    def _carregar_ou_criar_indice(self) -> Optional[Union[FAISS, IndiceCompacto]]:
+        """Lê o índice do disco, criando-o via OCR se ainda não existir"""
+        try:
+            if not indice_existe():
                 logger.info("Índice não encontrado, criando novo...")
-                if not self.criar_indice_faiss():
-                    return None
-            
-            vectorstore = FAISS.load_local(
-                INDEX_PATH,
-                self.embeddings,
-                allow_dangerous_deserialization=True
-            )
+                return self._construir_indice()
             
-            logger.info("Índice FAISS carregado com sucesso")
+            if modo_compacto():
+                vectorstore = IndiceCompacto.carregar(INDEX_PATH)
+                logger.info(f"Índice compacto ({vectorstore.modo}) carregado com sucesso")
+            else:
+                from langchain_community.vectorstores import FAISS
+                vectorstore = FAISS.load_local(
+                    INDEX_PATH,
+                    self.embeddings,
+                    allow_dangerous_deserialization=True
+                )
+                logger.info("Índice FAISS carregado com sucesso")
+            
+            self._garantir_metadados_indice(vectorstore)
             return vectorstore
             
         except Exception as e:
             logger.error(f"Erro ao carregar índice: {str(e)}")
             return None
     
+    def _garantir_metadados_indice(self, vectorstore: Union[FAISS, IndiceCompacto]) -> None:
+        """Grava index_meta.json se ele não existir ou descrever outro formato
+        
+        Cobre índices criados antes do arquivo existir e a troca de
+        INDEX_STORAGE_MODE quando os dois formatos estão no disco.
+        """
+        meta = ler_metadados_indice()
+        if meta is not None and meta.get("modo_armazenamento") == _modo_do_indice(vectorstore):
+            return
+        try:
+            if isinstance(vectorstore, IndiceCompacto):
+                metadados = vectorstore.metadados
+            else:
+                metadados = [doc.metadata for doc in vectorstore.docstore._dict.values()
+                             if hasattr(doc, 'metadata')]
+            _salvar_metadados_indice(metadados, _modo_do_indice(vectorstore))
+            logger.info("Metadados do índice gravados a partir do índice existente")
+        except Exception as e:
+            logger.error(f"Erro ao gravar metadados do índice: {str(e)}")
+    
+    def _criar_retriever(self, vectorstore: Union[FAISS, IndiceCompacto], max_results: int):
+        """Cria o retriever adequado ao tipo de índice carregado"""
+        if isinstance(vectorstore, IndiceCompacto):
+            return criar_retriever(vectorstore, self.embeddings, k=max_results, rescore=INDEX_RESCORE)
+        return vectorstore.as_retriever(
+            search_type="similarity",
+            search_kwargs={"k": max_results}
+        )
+    
     def escolher_documento_opcoes(self, opcoes: List[Document], pergunta: str) -> Document:
         """Permite ao usuário escolher entre múltiplos documentos relevantes com contexto"""
         print(f"\n🔍 Encontrei {len(opcoes)} documentos relevantes para: '{pergunta}'")
@@ -193,10 +460,7 @@ class DocumentProcessor:
                 return "❌ Erro: Não foi possível carregar ou criar o índice de documentos."
             
             # Configurar retriever sem score threshold para debug
-            retriever = vectorstore.as_retriever(
-                search_type="similarity",
-                search_kwargs={"k": max_results}
-            )
+            retriever = self._criar_retriever(vectorstore, max_results)
             
             # Buscar documentos relevantes usando o método correto
             try:
@@ -219,24 +483,13 @@ class DocumentProcessor:
             contexto = doc_escolhido.page_content
             arquivo = doc_escolhido.metadata.get("arquivo", "Desconhecido")
             
+            from langchain.chains import RetrievalQA
+            from langchain.prompts import PromptTemplate
+            
             # Prompt melhorado para o LLM com contexto da pergunta
             prompt_template = PromptTemplate(
                 input_variables=["context", "question"],
-                template="""Você é um assistente especializado em documentos que ajuda usuários a entender o conteúdo de documentos.
-
-📋 **Conteúdo do documento:**
-{context}
-
-❓ **Pergunta do usuário:** {question}
-
-💡 **Instruções:**
-Baseado APENAS no contexto fornecido, responda à pergunta do usuário de forma clara e precisa.
-- Se a informação estiver disponível no contexto, forneça uma resposta completa
-- Se a informação NÃO estiver disponível no contexto, indique claramente isso
-- Seja profissional, objetivo e direto ao ponto
-- Use o contexto específico do documento para fundamentar sua resposta
-
-🔍 **Resposta baseada no documento:**"""
+                template=PROMPT_RAG
             )
             
             # Executar a consulta
@@ -263,10 +516,7 @@ Baseado APENAS no contexto fornecido, responda à pergunta do usuário de forma
             if not vectorstore:
                 return []
             
-            retriever = vectorstore.as_retriever(
-                search_type="similarity",
-                search_kwargs={"k": max_results}
-            )
+            retriever = self._criar_retriever(vectorstore, max_results)
             
             # Usar o método correto baseado na versão
             try:
@@ -279,6 +529,88 @@ Baseado APENAS no contexto fornecido, responda à pergunta do usuário de forma
             logger.error(f"Erro ao buscar documentos similares: {str(e)}")
             return []
     
+    async def _aobter_cliente(self, nome: str):
+        """Obtém embeddings/llm sem bloquear o event loop enquanto são criados"""
+        cliente = getattr(self, f"_{nome}")
+        if cliente is None:
+            cliente = await asyncio.to_thread(getattr, self, nome)
+        return cliente
+    
+    async def _aembed_query(self, texto: str) -> List[float]:
+        """Embedding assíncrono da consulta"""
+        embeddings = await self._aobter_cliente("embeddings")
+        return await embeddings.aembed_query(texto)
+    
+    async def abuscar_documentos_similares(self, texto: str, max_results: int = 3) -> List[Document]:
+        """Versão assíncrona de buscar_documentos_similares
+        
+        O embedding da consulta usa o cliente assíncrono; carregar o índice e a
+        busca FAISS rodam em uma thread para não bloquear o event loop.
+        """
+        try:
+            vetor, vectorstore = await asyncio.gather(
+                self._aembed_query(texto),
+                asyncio.to_thread(self.carregar_indice)
+            )
+            if not vectorstore:
+                return []
+            
+            if isinstance(vectorstore, IndiceCompacto):
+                return await asyncio.to_thread(
+                    vectorstore.similarity_search_by_vector, vetor, max_results, INDEX_RESCORE
+                )
+            return await asyncio.to_thread(vectorstore.similarity_search_by_vector, vetor, max_results)
+            
+        except Exception as e:
+            logger.error(f"Erro ao buscar documentos similares: {str(e)}")
+            return []
+    
+    async def aexecutar_rag(self, pergunta: str, max_results: int = 5,
+                            documento: Optional[Document] = None) -> str:
+        """Versão assíncrona de executar_rag
+        
+        Se o documento já foi escolhido, chama o LLM diretamente com o conteúdo
+        dele, sem a nova busca (e o novo embedding) feita pelo RetrievalQA.
+        """
+        try:
+            if documento is None:
+                docs = await self.abuscar_documentos_similares(pergunta, max_results)
+                if not docs:
+                    return "❌ Nenhum documento relevante encontrado para sua pergunta. Tente reformular ou verificar se há documentos na pasta."
+                documento = docs[0]
+            
+            arquivo = documento.metadata.get("arquivo", "Desconhecido")
+            prompt = PROMPT_RAG.format(context=documento.page_content, question=pergunta)
+            llm = await self._aobter_cliente("llm")
+            resposta = await llm.ainvoke(prompt)
+            
+            return f"📄 **Documento consultado:** {arquivo}\n\n{resposta.content}"
+            
+        except Exception as e:
+            error_msg = f"❌ Erro ao executar consulta RAG: {str(e)}"
+            logger.error(error_msg)
+            return error_msg
+    
+    def _descartar_clientes(self):
+        """Descarta embeddings/llm e retorna a sessão HTTP para ser fechada"""
+        with self._lock_embeddings, self._lock_llm, self._lock_http:
+            cliente, self._http_async_client = self._http_async_client, None
+            self._embeddings = None
+            self._llm = None
+        return cliente
+    
+    async def afechar(self) -> None:
+        """Fecha a sessão HTTP assíncrona compartilhada
+        
+        Os clientes que a usam também são descartados, para que o próximo uso
+        crie clientes novos em vez de reaproveitar a sessão fechada.
+        """
+        # Os locks podem estar com a thread de aquecimento criando um cliente;
+        # esperamos por eles fora do event loop
+        cliente = await asyncio.to_thread(self._descartar_clientes)
+        if cliente is not None:
+            await cliente.aclose()
+    
     def obter_estatisticas_indice(self) -> Dict[str, Any]:
         """Retorna estatísticas detalhadas sobre o índice atual"""
         try:
@@ -286,28 +618,34 @@ Baseado APENAS no contexto fornecido, responda à pergunta do usuário de forma
             if not vectorstore:
                 return {"status": "erro", "mensagem": "Índice não disponível"}
             
-            # Contar documentos
-            num_docs = len(vectorstore.docstore._dict)
-            
             # Obter tipos de arquivos únicos
             tipos_arquivo = set()
             arquivos = set()
             total_chunks = 0
             
-            for doc_id, doc in vectorstore.docstore._dict.items():
-                if hasattr(doc, 'metadata'):
-                    tipos_arquivo.add(doc.metadata.get('tipo_arquivo', 'desconhecido'))
-                    arquivos.add(doc.metadata.get('arquivo', 'desconhecido'))
-                    total_chunks += 1
+            if isinstance(vectorstore, IndiceCompacto):
+                metadados = vectorstore.metadados
+            else:
+                metadados = [doc.metadata for doc in vectorstore.docstore._dict.values()
+                             if hasattr(doc, 'metadata')]
+            
+            for metadata in metadados:
+                tipos_arquivo.add(metadata.get('tipo_arquivo', 'desconhecido'))
+                arquivos.add(metadata.get('arquivo', 'desconhecido'))
+                total_chunks += 1
             
-            return {
+            estatisticas = {
                 "status": "ativo",
                 "total_documentos": total_chunks,
                 "arquivos_unicos": len(arquivos),
                 "tipos_arquivo": list(tipos_arquivo),
+                "modo_armazenamento": _modo_do_indice(vectorstore),
                 "caminho_indice": INDEX_PATH,
                 "ultima_atualizacao": "Agora"
             }
+            if isinstance(vectorstore, IndiceCompacto):
+                estatisticas["bytes_em_memoria"] = vectorstore.bytes_em_memoria()
+            return estatisticas
             
         except Exception as e:
             return {"status": "erro", "mensagem": str(e)}
@@ -323,6 +661,16 @@ Baseado APENAS no contexto fornecido, responda à pergunta do usuário de forma
                 os.remove(index_faiss)
             if os.path.exists(index_pkl):
                 os.remove(index_pkl)
+            index_meta = os.path.join(INDEX_PATH, INDEX_META)
+            if os.path.exists(index_meta):
+                os.remove(index_meta)
+            for nome in ARQUIVOS_COMPACTOS:
+                arquivo = os.path.join(INDEX_PATH, nome)
+                if os.path.exists(arquivo):
+                    os.remove(arquivo)
+            
+            with self._lock_indice:
+                self._futuro_indice = None
             
             logger.info("Arquivos de índice removidos, recriando...")
             return self.criar_indice_faiss()